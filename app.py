@@ -4,42 +4,129 @@
 # Persistência simples: JSON (arquivo gerenciado pelo código)
 # Autor: Copilot
 
+import bisect
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
 import os
-from datetime import datetime
+import re
+import sys
+import threading
+import time
+import unicodedata
+import urllib.request
+from datetime import datetime, timedelta
 from flask import Flask, request, redirect, url_for, render_template_string, flash
 
 app = Flask(__name__)
 app.secret_key = "changeme-secret-key"  # ajuste se desejar
 
 DATA_FILE = "data.json"
+JOURNAL_FILE = "data.journal"  # diário de alterações (uma linha JSON por gravação)
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+SOMENTE_LEITURA = False  # True na réplica (python app.py replica)
 
 # -------------------------
 # Persistência e estrutura
 # -------------------------
+# Cada save_data() primeiro acrescenta ao diário as alterações feitas e só
+# depois regrava data.json (arquivo temporário + os.replace), então quem lê
+# data.json nunca vê uma gravação pela metade. O campo "journal_seq" indica
+# a última entrada do diário já refletida em data.json; ao carregar, as
+# entradas posteriores são reaplicadas.
+_data_lock = threading.Lock()
+
+def _gravar_atomico(caminho, texto):
+    tmp = caminho + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, caminho)
+
+def ler_diario(apos_seq=0, caminho=JOURNAL_FILE):
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                entrada = json.loads(linha)
+            except ValueError:
+                continue  # linha incompleta no fim do arquivo
+            if entrada["seq"] > apos_seq:
+                yield entrada
+
+def aplicar_entrada(data, entrada, copiar=False):
+    """Aplica uma entrada do diário em `data`. Com `copiar`, cada coleção
+    alterada é copiada e trocada de uma vez, sem mexer no dict que outra
+    thread pode estar percorrendo (réplica servindo leituras)."""
+    novas = {}
+    def colecao(nome):
+        if nome not in novas:
+            atual = data.get(nome, {})
+            novas[nome] = dict(atual) if copiar else atual
+        return novas[nome]
+    for chave, reg in entrada.get("set", {}).items():
+        nome, rid = chave.split("/", 1)
+        colecao(nome)[rid] = reg
+    for chave in entrada.get("del", []):
+        nome, rid = chave.split("/", 1)
+        colecao(nome).pop(rid, None)
+    data.update(novas)
+    data.update(entrada.get("meta", {}))
+    data["journal_seq"] = entrada["seq"]
+
 def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {
-            "next_client_id": 1,
-            "next_order_id": 1,
-            "clients": {},  # id -> {id, nome, telefone, email, endereco, documento, observacoes}
-            "orders": {}    # id -> {id, client_id, criado_em, prazo, status, prioridade, descricao, tecnico,
-                            #         estimativa, pecas, mao_obra, total, notas}
+    data = {
+        "next_client_id": 1,
+        "next_order_id": 1,
+        "next_view_id": 1,
+        "journal_seq": 0,
+        "clients": {},  # id -> {id, nome, telefone, email, endereco, documento, observacoes}
+        "orders": {},   # id -> {id, client_id, criado_em, prazo, status, prioridade, descricao, tecnico,
+                        #         estimativa, pecas, mao_obra, total, notas}
+        "views": {}     # id -> {id, nome, filtros: {q, status, prioridade, cliente_id, tecnico}}
+    }
+    if os.path.exists(DATA_FILE):
+        with open(DATA_FILE, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except Exception:
+                pass
+    data.setdefault("next_view_id", 1)
+    data.setdefault("views", {})
+    # cobre uma queda entre gravar o diário e regravar data.json
+    for entrada in ler_diario(data.get("journal_seq", 0)):
+        aplicar_entrada(data, entrada)
+    return data
+
+def save_data(*alteracoes):
+    """Grava o estado atual. `alteracoes` são os pares (colecao, id) alterados
+    ou excluídos, que vão para o diário."""
+    with _data_lock:
+        seq = DATA.get("journal_seq", 0) + 1
+        entrada = {
+            "seq": seq,
+            "ts": datetime.now().strftime(TS_FMT),
+            "meta": {k: v for k, v in DATA.items() if k.startswith("next_")},
+            "set": {},
+            "del": [],
         }
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {
-                "next_client_id": 1,
-                "next_order_id": 1,
-                "clients": {},
-                "orders": {}
-            }
-
-def save_data():
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(DATA, f, ensure_ascii=False, indent=2)
+        for colecao, rid in alteracoes:
+            reg = DATA[colecao].get(str(rid))
+            if reg is None:
+                entrada["del"].append(f"{colecao}/{rid}")
+            else:
+                entrada["set"][f"{colecao}/{rid}"] = reg
+        with open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        DATA["journal_seq"] = seq
+        _gravar_atomico(DATA_FILE, json.dumps(DATA, ensure_ascii=False, indent=2))
 
 DATA = load_data()
 
@@ -69,29 +156,522 @@ def get_client_name(cid):
     c = DATA["clients"].get(str(cid))
     return c["nome"] if c else "Cliente removido"
 
-def filtered_orders(q=None, status=None, prioridade=None, cliente_id=None):
-    itens = []
-    for oid, o in DATA["orders"].items():
-        match = True
-        if q:
-            ql = q.lower()
-            c_nome = get_client_name(o["client_id"]).lower()
-            campos = " ".join([
-                o.get("descricao",""), o.get("tecnico",""), o.get("notas",""), c_nome
-            ]).lower()
-            match = ql in campos
-        if status and match:
-            match = o.get("status") == status
-        if prioridade and match:
-            match = o.get("prioridade") == prioridade
-        if cliente_id and match:
-            match = str(o.get("client_id")) == str(cliente_id)
-        if match:
-            itens.append(o)
+def order_matches(o, q=None, status=None, prioridade=None, cliente_id=None, tecnico=None):
+    match = True
+    if q:
+        ql = q.lower()
+        c_nome = get_client_name(o["client_id"]).lower()
+        campos = " ".join([
+            o.get("descricao",""), o.get("tecnico",""), o.get("notas",""), c_nome
+        ]).lower()
+        match = ql in campos
+    if status and match:
+        match = o.get("status") == status
+    if prioridade and match:
+        match = o.get("prioridade") == prioridade
+    if cliente_id and match:
+        match = str(o.get("client_id")) == str(cliente_id)
+    if tecnico and match:
+        match = o.get("tecnico","").strip().lower() == tecnico.strip().lower()
+    return match
+
+def filtered_orders(q=None, status=None, prioridade=None, cliente_id=None, tecnico=None):
+    itens = [o for o in DATA["orders"].values() if order_matches(o, q, status, prioridade, cliente_id, tecnico)]
     # ordena por criado_em desc
     itens.sort(key=lambda x: x.get("criado_em",""), reverse=True)
     return itens
 
+# -------------------------
+# Monitor de prazos (SLA)
+# -------------------------
+# As OS abertas ficam num min-heap indexado pelo instante do próximo evento
+# (aviso de prazo próximo e atraso). Cada tick só retira do topo o que já
+# venceu, então o custo depende das OS vencidas e não do total de ordens.
+# Alterações de prazo/status geram uma nova versão; entradas antigas que
+# continuam no heap são descartadas quando chegam ao topo. Os eventos já
+# enviados ficam na própria OS (sla_notificado: {tipo: prazo}) para não
+# serem repetidos quando o app reinicia.
+SLA_LOG_FILE = "sla_eventos.log"
+SLA_WEBHOOK_URL = os.environ.get("SLA_WEBHOOK_URL", "")  # vazio = sem webhook
+SLA_AVISO_MINUTOS = 60   # antecedência do aviso de prazo próximo
+SLA_TICK_SEGUNDOS = 30
+STATUS_ABERTOS = ("Aberta", "Em andamento")
+
+_sla_heap = []    # (instante, seq, oid, versao, tipo, prazo agendado)
+_sla_versao = {}  # oid -> versão vigente do agendamento
+_sla_seq = itertools.count()
+_sla_lock = threading.Lock()
+
+def parse_prazo(prazo):
+    try:
+        return datetime.strptime((prazo or "").strip(), "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+
+def sla_agendar(o, agora=None):
+    """(Re)agenda os eventos de prazo de uma OS, invalidando os anteriores."""
+    oid = str(o["id"])
+    agora = agora or datetime.now()
+    with _sla_lock:
+        versao = _sla_versao.get(oid, 0) + 1
+        _sla_versao[oid] = versao
+        if o.get("status") not in STATUS_ABERTOS:
+            return
+        prazo = parse_prazo(o.get("prazo"))
+        if prazo is None:
+            return
+        notificado = o.get("sla_notificado", {})
+        if prazo > agora and notificado.get("prazo_proximo") != o["prazo"]:
+            aviso = prazo - timedelta(minutes=SLA_AVISO_MINUTOS)
+            heapq.heappush(_sla_heap, (aviso, next(_sla_seq), oid, versao, "prazo_proximo", o["prazo"]))
+        if notificado.get("atrasada") != o["prazo"]:
+            heapq.heappush(_sla_heap, (prazo, next(_sla_seq), oid, versao, "atrasada", o["prazo"]))
+
+def sla_cancelar(oid):
+    # ids de OS não são reaproveitados, então basta esquecer a versão
+    with _sla_lock:
+        _sla_versao.pop(str(oid), None)
+
+def sla_notificar(tipo, oid, prazo):
+    o = DATA["orders"].get(oid, {})
+    evento = {
+        "tipo": tipo,
+        "os": oid,
+        "cliente": get_client_name(o.get("client_id")),
+        "tecnico": o.get("tecnico", ""),
+        "prioridade": o.get("prioridade", ""),
+        "prazo": prazo,
+        "disparado_em": now_str(),
+    }
+    with open(SLA_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+    if SLA_WEBHOOK_URL:
+        req = urllib.request.Request(
+            SLA_WEBHOOK_URL,
+            data=json.dumps(evento, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            app.logger.warning("Falha no webhook de SLA: %s", e)
+
+def sla_tick(agora=None):
+    """Dispara os eventos vencidos até `agora` e devolve a lista disparada."""
+    agora = agora or datetime.now()
+    disparos = []
+    with _sla_lock:
+        while _sla_heap and _sla_heap[0][0] <= agora:
+            instante, _, oid, versao, tipo, prazo = heapq.heappop(_sla_heap)
+            if _sla_versao.get(oid) == versao:
+                disparos.append((tipo, oid, instante, prazo))
+    for tipo, oid, _, prazo in disparos:
+        sla_notificar(tipo, oid, prazo)
+    # marca o prazo para o qual o evento foi agendado (não o atual, que pode
+    # ter sido editado nesse meio tempo), sob o lock usado por save_data
+    alteradas = []
+    with _data_lock:
+        for tipo, oid, _, prazo in disparos:
+            o = DATA["orders"].get(oid)
+            if o is not None:
+                o.setdefault("sla_notificado", {})[tipo] = prazo
+                alteradas.append(("orders", oid))
+    if alteradas:
+        save_data(*alteradas)
+    return [(tipo, oid, instante) for tipo, oid, instante, _ in disparos]
+
+def sla_worker():
+    while True:
+        try:
+            sla_tick()
+        except Exception as e:
+            app.logger.exception("Erro no monitor de SLA: %s", e)
+        time.sleep(SLA_TICK_SEGUNDOS)
+
+def iniciar_monitor_sla():
+    threading.Thread(target=sla_worker, name="monitor-sla", daemon=True).start()
+
+for _o in DATA["orders"].values():
+    sla_agendar(_o)
+
+# -------------------------
+# Backups e réplica
+# -------------------------
+# Os incrementais são as entradas do diário desde o último backup. O backup
+# completo usa o data.json já gravado (sempre consistente, pois save_data o
+# troca atomicamente): sob _data_lock só se lê esse arquivo e se renomeia o
+# diário, que recomeça vazio. O diário renomeado vira um último incremental
+# e a compressão (gzip), o sha256 e as gravações acontecem fora do lock.
+BACKUP_DIR = "backups"
+JOURNAL_ROTACIONADO = JOURNAL_FILE + ".backup"
+BACKUP_MANIFEST = os.path.join(BACKUP_DIR, "manifest.json")
+BACKUP_INCREMENTAL_SEGUNDOS = 300
+BACKUP_COMPLETO_SEGUNDOS = 24 * 3600
+_backup_lock = threading.Lock()
+
+def ler_manifesto():
+    if not os.path.exists(BACKUP_MANIFEST):
+        return []
+    with open(BACKUP_MANIFEST, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _gravar_backup(manifesto, tipo, dados, **info):
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    carimbo = datetime.now()
+    arquivo = f"{tipo}-{carimbo.strftime('%Y%m%d-%H%M%S')}-{info['seq_fim']}.gz"
+    comprimido = gzip.compress(dados.encode("utf-8"))
+    with open(os.path.join(BACKUP_DIR, arquivo), "wb") as f:
+        f.write(comprimido)
+        f.flush()
+        os.fsync(f.fileno())
+    item = dict(info, tipo=tipo, arquivo=arquivo, criado_em=carimbo.strftime(TS_FMT),
+                sha256=hashlib.sha256(comprimido).hexdigest())
+    manifesto.append(item)
+    _gravar_atomico(BACKUP_MANIFEST, json.dumps(manifesto, ensure_ascii=False, indent=2))
+    return item
+
+def _ler_backup(item):
+    with open(os.path.join(BACKUP_DIR, item["arquivo"]), "rb") as f:
+        comprimido = f.read()
+    if hashlib.sha256(comprimido).hexdigest() != item["sha256"]:
+        raise ValueError(f"Checksum inválido em {item['arquivo']}")
+    return gzip.decompress(comprimido).decode("utf-8")
+
+def _backup_incremental(caminho=JOURNAL_FILE):
+    # quem chama deve segurar _backup_lock
+    manifesto = ler_manifesto()
+    ultimo_seq = max((b["seq_fim"] for b in manifesto), default=0)
+    entradas = list(ler_diario(ultimo_seq, caminho))
+    if not entradas:
+        return None
+    return _gravar_backup(
+        manifesto, "incremental",
+        "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entradas),
+        seq_ini=entradas[0]["seq"], seq_fim=entradas[-1]["seq"],
+        ts_ini=entradas[0]["ts"], ts_fim=entradas[-1]["ts"],
+    )
+
+def backup_incremental():
+    """Guarda as entradas do diário ainda não cobertas por nenhum backup."""
+    with _backup_lock:
+        return _backup_incremental()
+
+def _fechar_diario_rotacionado():
+    _backup_incremental(JOURNAL_ROTACIONADO)
+    os.remove(JOURNAL_ROTACIONADO)
+
+def backup_completo():
+    with _backup_lock:
+        if os.path.exists(JOURNAL_ROTACIONADO):
+            _fechar_diario_rotacionado()  # sobra de um backup interrompido
+        with _data_lock:
+            if os.path.exists(DATA_FILE):
+                with open(DATA_FILE, "r", encoding="utf-8") as f:
+                    texto = f.read()
+            else:
+                texto = json.dumps(load_data(), ensure_ascii=False)
+            ts = datetime.now().strftime(TS_FMT)
+            if os.path.exists(JOURNAL_FILE):
+                os.replace(JOURNAL_FILE, JOURNAL_ROTACIONADO)
+        if os.path.exists(JOURNAL_ROTACIONADO):
+            _fechar_diario_rotacionado()
+        seq = json.loads(texto).get("journal_seq", 0)
+        return _gravar_backup(ler_manifesto(), "completo", texto, seq_ini=seq, seq_fim=seq, ts=ts)
+
+def restaurar(ate):
+    """Reconstrói o estado como estava no instante `ate` (datetime)."""
+    limite = ate.strftime(TS_FMT)
+    manifesto = ler_manifesto()
+    completos = [b for b in manifesto if b["tipo"] == "completo" and b["ts"] <= limite]
+    if not completos:
+        raise ValueError(f"Nenhum backup completo anterior a {limite}; não é possível restaurar esse instante.")
+    base = completos[-1]
+    data = json.loads(_ler_backup(base))
+    entradas = []
+    for b in manifesto:
+        if b["tipo"] == "incremental" and b["seq_fim"] > base["seq_fim"]:
+            entradas.extend(json.loads(l) for l in _ler_backup(b).splitlines())
+    # o que ainda está só no diário local também entra
+    entradas.extend(ler_diario(max((b["seq_fim"] for b in manifesto), default=0)))
+    for e in entradas:
+        if e["ts"] > limite:
+            break
+        if e["seq"] > data.get("journal_seq", 0):
+            aplicar_entrada(data, e)
+    return data
+
+def backup_worker():
+    ultimo_completo = max((b["criado_em"] for b in ler_manifesto() if b["tipo"] == "completo"), default="")
+    while True:
+        try:
+            limite = (datetime.now() - timedelta(seconds=BACKUP_COMPLETO_SEGUNDOS)).strftime(TS_FMT)
+            if ultimo_completo <= limite:
+                ultimo_completo = backup_completo()["criado_em"]
+            else:
+                backup_incremental()
+        except Exception as e:
+            app.logger.exception("Erro no backup: %s", e)
+        time.sleep(BACKUP_INCREMENTAL_SEGUNDOS)
+
+def iniciar_backups():
+    threading.Thread(target=backup_worker, name="backup", daemon=True).start()
+
+def replica_worker():
+    """Acompanha o diário da instância principal e aplica as alterações."""
+    global DATA
+    f, inode = None, "inicio"
+    while True:
+        try:
+            try:
+                st = os.stat(JOURNAL_FILE)
+            except FileNotFoundError:
+                st = None
+            inode_atual = st.st_ino if st else None
+            if inode_atual != inode or (f and st.st_size < f.tell()):
+                # diário recomeçado (backup completo): recarrega data.json + diário novo
+                if f:
+                    f.close()
+                f, inode = None, inode_atual
+                DATA = load_data()
+                reconstruir_indices()
+                if st is not None:
+                    # relê do início: o filtro por seq ignora o que load_data já aplicou
+                    f = open(JOURNAL_FILE, "r", encoding="utf-8")
+                    inode = os.fstat(f.fileno()).st_ino
+            while f:
+                pos = f.tell()
+                linha = f.readline()
+                if not linha.endswith("\n"):
+                    f.seek(pos)  # gravação em andamento
+                    break
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    app.logger.warning("Linha inválida no diário ignorada: %r", linha[:200])
+                    continue
+                if entrada["seq"] > DATA.get("journal_seq", 0):
+                    aplicar_entrada(DATA, entrada, copiar=True)
+                    atualizar_indices(entrada)
+        except Exception as e:
+            app.logger.exception("Erro na réplica: %s", e)
+            inode = "erro"  # força recarregar tudo na próxima volta
+        time.sleep(1)
+
+def reconstruir_indices():
+    with _dup_lock:
+        _dup_index.clear()
+        _dup_chaves.clear()
+        for c in list(DATA["clients"].values()):
+            indexar_cliente(c)
+    materializar_views()
+
+def atualizar_indices(entrada):
+    """Mantém os índices em memória alinhados a uma entrada do diário."""
+    for chave in list(entrada.get("set", {})) + entrada.get("del", []):
+        colecao, rid = chave.split("/", 1)
+        if colecao == "clients":
+            if rid in DATA["clients"]:
+                indexar_cliente(DATA["clients"][rid])
+            else:
+                desindexar_cliente(rid)
+            views_cliente_alterado()
+        elif colecao == "orders":
+            views_atualizar_os(rid)
+        elif colecao == "views":
+            materializar_view(rid)
+
+@app.before_request
+def bloquear_escrita_na_replica():
+    if SOMENTE_LEITURA and request.method != "GET":
+        flash("Réplica somente leitura: faça alterações na instância principal.")
+        return redirect(request.referrer or url_for("dashboard"))
+
+# -------------------------
+# Clientes duplicados
+# -------------------------
+# Em vez de comparar todos os pares de clientes, cada cliente gera chaves de
+# bloqueio (telefone, documento e email normalizados e uma chave fonética do
+# nome). Um índice chave -> ids dá os candidatos em tempo proporcional ao
+# tamanho dos blocos, e o relatório só compara clientes que dividem um bloco.
+# As rotas e o replica_worker alteram o índice, então o acesso usa _dup_lock.
+_dup_index = {}   # chave de bloqueio -> {id do cliente}
+_dup_chaves = {}  # id do cliente -> chaves indexadas
+_dup_lock = threading.RLock()
+PARTICULAS = {"da", "de", "do", "das", "dos", "e"}
+MOTIVOS = {"tel": "telefone", "doc": "documento", "email": "email", "nome": "nome"}
+
+def so_digitos(v):
+    return re.sub(r"\D", "", v or "")
+
+def chave_fonetica(nome):
+    """Chave fonética simplificada (português) do primeiro e último nome.
+
+    Unifica grafias de mesmo som (ph/f, ç/ss/s, z/s, c/k/qu, y/i, w/v, h mudo,
+    letras dobradas) mas mantém as vogais, para Maria/Mário/Mauro não colidirem."""
+    s = (nome or "").lower().replace("ç", "s")
+    s = unicodedata.normalize("NFKD", s)
+    s = re.sub(r"[^a-z ]", "", "".join(ch for ch in s if not unicodedata.combining(ch)))
+    partes = []
+    for p in s.split():
+        if p in PARTICULAS:
+            continue
+        for a, b in (("ph", "f"), ("lh", "l"), ("nh", "n"), ("ch", "x"), ("sh", "x"),
+                     ("qu", "k"), ("gu", "g"), ("y", "i"), ("w", "v")):
+            p = p.replace(a, b)
+        p = re.sub(r"sc(?=[ei])", "s", p)
+        p = re.sub(r"c(?=[ei])", "s", p).replace("c", "k").replace("z", "s").replace("h", "")
+        if p:
+            partes.append(re.sub(r"(.)\1+", r"\1", p))
+    if len(partes) < 2:
+        return ""  # um nome só gera blocos grandes demais
+    return partes[0] + " " + partes[-1]
+
+def chaves_duplicidade(c):
+    chaves = []
+    tel = so_digitos(c.get("telefone"))
+    if len(tel) >= 8:
+        chaves.append("tel:" + tel[-8:])  # ignora DDI/DDD e o nono dígito
+    doc = so_digitos(c.get("documento"))
+    if len(doc) >= 11:
+        chaves.append("doc:" + doc)
+    email = (c.get("email") or "").strip().lower()
+    if "@" in email:
+        chaves.append("email:" + email)
+    nome = chave_fonetica(c.get("nome"))
+    if nome:
+        chaves.append("nome:" + nome)
+    return chaves
+
+def indexar_cliente(c):
+    cid = str(c["id"])
+    chaves = chaves_duplicidade(c)
+    with _dup_lock:
+        desindexar_cliente(cid)
+        for k in chaves:
+            _dup_index.setdefault(k, set()).add(cid)
+        _dup_chaves[cid] = chaves
+
+def desindexar_cliente(cid):
+    with _dup_lock:
+        for k in _dup_chaves.pop(str(cid), []):
+            bloco = _dup_index.get(k)
+            if bloco:
+                bloco.discard(str(cid))
+                if not bloco:
+                    del _dup_index[k]
+
+def candidatos_duplicados(c, ignorar=None):
+    """Clientes que dividem alguma chave com `c`: [(cliente, [motivos])], mais motivos primeiro."""
+    clientes = DATA["clients"]
+    motivos = {}
+    with _dup_lock:
+        blocos = [(k, list(_dup_index.get(k, ()))) for k in chaves_duplicidade(c)]
+    for k, ids in blocos:
+        for cid in ids:
+            if cid != str(ignorar) and cid in clientes:
+                motivos.setdefault(cid, []).append(MOTIVOS[k.split(":", 1)[0]])
+    return sorted(((clientes[cid], m) for cid, m in motivos.items() if cid in clientes),
+                  key=lambda x: (-len(x[1]), x[0]["id"]))
+
+def chaves_fortes(cid):
+    # o nome fonético é só um indício; telefone, documento e email identificam
+    with _dup_lock:
+        return {k for k in _dup_chaves.get(str(cid), []) if not k.startswith("nome:")}
+
+def grupos_duplicados():
+    """Devolve (grupos, parecidos). `grupos` junta (union-find) os clientes
+    ligados por telefone, documento ou email; `parecidos` são os blocos de
+    nome fonético que não caem inteiros num desses grupos, sem encadear."""
+    clientes = DATA["clients"]
+    with _dup_lock:
+        blocos = [(k, list(ids)) for k, ids in _dup_index.items() if len(ids) > 1]
+    pai = {}
+    def raiz(x):
+        while pai.setdefault(x, x) != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+    for k, ids in blocos:
+        if not k.startswith("nome:"):
+            primeiro, *resto = ids
+            for outro in resto:
+                pai[raiz(outro)] = raiz(primeiro)
+    grupos = {}
+    for cid in list(pai):
+        if cid in clientes:
+            grupos.setdefault(raiz(cid), []).append(clientes[cid])
+    parecidos = []
+    for k, ids in blocos:
+        ids = [cid for cid in ids if cid in clientes]
+        if k.startswith("nome:") and len(ids) > 1 and len({raiz(cid) for cid in ids}) > 1:
+            parecidos.append(sorted((clientes[cid] for cid in ids), key=lambda c: c["id"]))
+    return ([sorted(g, key=lambda c: c["id"]) for g in grupos.values() if len(g) > 1],
+            sorted(parecidos, key=lambda g: g[0]["id"]))
+
+# -------------------------
+# Visões salvas
+# -------------------------
+# Cada visão salva é um conjunto de filtros de /ordens cujo resultado fica
+# materializado numa lista ordenada de (criado_em, -id). Toda alteração de
+# OS é testada contra o predicado de cada visão e a lista é ajustada com
+# bisect, então abrir uma visão custa só a renderização. Visões com busca
+# textual dependem do nome do cliente e são refeitas quando um cliente muda.
+# As rotas (servidor com threads) e o replica_worker mexem nas listas, por
+# isso todo acesso passa por _views_lock.
+_views_mat = {}  # id da visão -> {"lista": [(criado_em, -id)], "membros": {oid: chave}}
+_views_lock = threading.RLock()
+
+def _chave_ordem(o):
+    return (o.get("criado_em",""), -int(o["id"]))
+
+def materializar_view(vid):
+    vid = str(vid)
+    with _views_lock:
+        v = DATA["views"].get(vid)
+        if v is None:
+            _views_mat.pop(vid, None)
+            return
+        membros = {str(o["id"]): _chave_ordem(o) for o in list(DATA["orders"].values())
+                   if order_matches(o, **v["filtros"])}
+        _views_mat[vid] = {"lista": sorted(membros.values()), "membros": membros}
+
+def materializar_views():
+    with _views_lock:
+        _views_mat.clear()
+        for vid in list(DATA["views"]):
+            materializar_view(vid)
+
+def views_atualizar_os(oid):
+    """Reflete a criação, edição ou exclusão de uma OS em todas as visões."""
+    oid = str(oid)
+    o = DATA["orders"].get(oid)
+    with _views_lock:
+        for vid, mat in _views_mat.items():
+            atual = mat["membros"].get(oid)
+            if atual is not None:
+                del mat["lista"][bisect.bisect_left(mat["lista"], atual)]
+                del mat["membros"][oid]
+            v = DATA["views"].get(vid)
+            if o is not None and v is not None and order_matches(o, **v["filtros"]):
+                chave = _chave_ordem(o)
+                bisect.insort(mat["lista"], chave)
+                mat["membros"][oid] = chave
+
+def views_cliente_alterado():
+    with _views_lock:
+        for vid, v in list(DATA["views"].items()):
+            if v["filtros"].get("q"):
+                materializar_view(vid)
+
+def view_orders(vid):
+    with _views_lock:
+        lista = list(_views_mat.get(str(vid), {"lista": []})["lista"])
+    # na réplica a OS pode sair de DATA antes de o índice ser atualizado
+    itens = (DATA["orders"].get(str(-neg_id)) for _, neg_id in reversed(lista))
+    return [o for o in itens if o is not None]
+
+reconstruir_indices()
+
 # -------------------------
 # Layout base com CSS
 # -------------------------
@@ -313,6 +893,7 @@ def list_clients():
         <div style="grid-column: span 4; align-self: end;">
           <button type="submit">Filtrar</button>
           <a class="btn" href="{url_for('new_client')}">Novo cliente</a>
+          <a class="btn" href="{url_for('duplicate_clients')}">Duplicados</a>
         </div>
       </form>
       <table class="table">
@@ -325,53 +906,70 @@ def list_clients():
 
 @app.route("/clientes/novo", methods=["GET","POST"])
 def new_client():
+    v = request.form
+    aviso = ""
     if request.method == "POST":
-        cid = DATA["next_client_id"]
-        DATA["next_client_id"] += 1
         c = {
-            "id": cid,
-            "nome": request.form.get("nome","").strip(),
-            "telefone": request.form.get("telefone","").strip(),
-            "email": request.form.get("email","").strip(),
-            "endereco": request.form.get("endereco","").strip(),
-            "documento": request.form.get("documento","").strip(),
-            "observacoes": request.form.get("observacoes","").strip()
+            "id": None,
+            "nome": v.get("nome","").strip(),
+            "telefone": v.get("telefone","").strip(),
+            "email": v.get("email","").strip(),
+            "endereco": v.get("endereco","").strip(),
+            "documento": v.get("documento","").strip(),
+            "observacoes": v.get("observacoes","").strip()
         }
-        DATA["clients"][str(cid)] = c
-        save_data()
-        flash("Cliente criado com sucesso.")
-        return redirect(url_for("list_clients"))
+        duplicados = candidatos_duplicados(c)
+        if duplicados and not v.get("confirmar"):
+            aviso = f"""
+            <div class="alert">
+              <strong>Possíveis clientes duplicados:</strong>
+              {"".join([f"<div><a href='{url_for('edit_client', client_id=d['id'])}'>#{d['id']} {d['nome']}</a> "
+                        f"— mesmo {', '.join(m)}</div>" for d, m in duplicados])}
+              <div>Confira antes de salvar ou clique em "Salvar mesmo assim".</div>
+            </div>
+            """
+        else:
+            cid = DATA["next_client_id"]
+            DATA["next_client_id"] += 1
+            c["id"] = cid
+            DATA["clients"][str(cid)] = c
+            save_data(("clients", cid))
+            indexar_cliente(c)
+            flash("Cliente criado com sucesso.")
+            return redirect(url_for("list_clients"))
 
     content = f"""
     <div class="panel">
       <h2>Novo cliente</h2>
+      {aviso}
       <form method="post" class="grid">
+        {'<input type="hidden" name="confirmar" value="1">' if aviso else ''}
         <div style="grid-column: span 6;">
           <label>Nome</label>
-          <input name="nome" required>
+          <input name="nome" value="{v.get('nome','')}" required>
         </div>
         <div style="grid-column: span 3;">
           <label>Telefone</label>
-          <input name="telefone">
+          <input name="telefone" value="{v.get('telefone','')}">
         </div>
         <div style="grid-column: span 3;">
           <label>Email</label>
-          <input name="email" type="email">
+          <input name="email" type="email" value="{v.get('email','')}">
         </div>
         <div style="grid-column: span 6;">
           <label>Endereço</label>
-          <input name="endereco">
+          <input name="endereco" value="{v.get('endereco','')}">
         </div>
         <div style="grid-column: span 3;">
           <label>Documento (CPF/CNPJ)</label>
-          <input name="documento">
+          <input name="documento" value="{v.get('documento','')}">
         </div>
         <div style="grid-column: span 12;">
           <label>Observações</label>
-          <textarea name="observacoes" rows="3"></textarea>
+          <textarea name="observacoes" rows="3">{v.get('observacoes','')}</textarea>
         </div>
         <div style="grid-column: span 12;">
-          <button type="submit">Salvar</button>
+          <button type="submit">{'Salvar mesmo assim' if aviso else 'Salvar'}</button>
           <a class="btn" href="{url_for('list_clients')}">Cancelar</a>
         </div>
       </form>
@@ -392,7 +990,9 @@ def edit_client(client_id):
         c["endereco"] = request.form.get("endereco","").strip()
         c["documento"] = request.form.get("documento","").strip()
         c["observacoes"] = request.form.get("observacoes","").strip()
-        save_data()
+        save_data(("clients", client_id))
+        indexar_cliente(c)
+        views_cliente_alterado()
         flash("Cliente atualizado.")
         return redirect(url_for("list_clients"))
 
@@ -443,12 +1043,84 @@ def delete_client(client_id):
             flash("Não é possível excluir: existem ordens de serviço vinculadas.")
         else:
             del DATA["clients"][cid]
-            save_data()
+            save_data(("clients", cid))
+            desindexar_cliente(cid)
             flash("Cliente excluído.")
     else:
         flash("Cliente não encontrado.")
     return redirect(url_for("list_clients"))
 
+@app.route("/clientes/duplicados")
+def duplicate_clients():
+    grupos, parecidos = grupos_duplicados()
+    n_os = {}
+    for o in DATA["orders"].values():
+        n_os[str(o.get("client_id"))] = n_os.get(str(o.get("client_id")), 0) + 1
+    blocos = []
+    for g, fraco in [(g, False) for g in grupos] + [(g, True) for g in parecidos]:
+        # sugere manter o cliente com mais OS (empate: o mais antigo)
+        manter = max(g, key=lambda c: (n_os.get(str(c["id"]), 0), -c["id"]))
+        # só vêm marcados os que dividem telefone, documento ou email com ele
+        fortes = chaves_fortes(manter["id"])
+        marcados = set() if fraco else {c["id"] for c in g if c is not manter and chaves_fortes(c["id"]) & fortes}
+        rows = "".join([
+            f"<tr><td><input type='radio' name='manter' value='{c['id']}' style='width:auto' {'checked' if c is manter else ''}></td>" +
+            f"<td><input type='checkbox' name='duplicados' value='{c['id']}' style='width:auto' {'checked' if c['id'] in marcados else ''}></td>" +
+            f"<td>{c['id']}</td><td>{c['nome']}</td><td>{c.get('telefone','')}</td><td>{c.get('email','')}</td>" +
+            f"<td>{c.get('documento','')}</td><td>{n_os.get(str(c['id']), 0)}</td></tr>"
+        for c in g])
+        blocos.append(f"""
+        <form method="post" action="{url_for('merge_clients')}" class="card" style="margin-bottom: 12px;">
+          {"<h3>Apenas nome parecido — confira antes de mesclar</h3>" if fraco else ""}
+          <table class="table">
+            <thead><tr><th>Manter</th><th>Mesclar</th><th>ID</th><th>Nome</th><th>Telefone</th><th>Email</th><th>Documento</th><th>OS</th></tr></thead>
+            <tbody>{rows}</tbody>
+          </table>
+          <button type="submit" onclick="return confirm('Mesclar clientes selecionados?')">Mesclar</button>
+        </form>
+        """)
+    content = f"""
+    <div class="panel">
+      <h2>Clientes possivelmente duplicados ({len(grupos)} grupos, {len(parecidos)} com nome parecido)</h2>
+      {"".join(blocos) or "<p>Nenhum duplicado encontrado.</p>"}
+      <a class="btn" href="{url_for('list_clients')}">Voltar</a>
+    </div>
+    """
+    return render_template_string(BASE, content=content)
+
+@app.route("/clientes/mesclar", methods=["POST"])
+def merge_clients():
+    manter = DATA["clients"].get(request.form.get("manter",""))
+    ids = [cid for cid in request.form.getlist("duplicados") if cid in DATA["clients"]]
+    if not manter:
+        flash("Selecione o cliente a manter.")
+        return redirect(url_for("duplicate_clients"))
+    ids = [cid for cid in ids if cid != str(manter["id"])]
+    if not ids:
+        flash("Selecione ao menos um cliente para mesclar.")
+        return redirect(url_for("duplicate_clients"))
+    # campos vazios do cliente mantido são completados pelos duplicados
+    for cid in ids:
+        for campo, valor in DATA["clients"][cid].items():
+            if campo != "id" and valor and not manter.get(campo):
+                manter[campo] = valor
+    movidas = []
+    for o in DATA["orders"].values():
+        if str(o.get("client_id")) in ids:
+            o["client_id"] = manter["id"]
+            movidas.append(("orders", o["id"]))
+    for cid in ids:
+        del DATA["clients"][cid]
+    save_data(("clients", manter["id"]), *[("clients", cid) for cid in ids], *movidas)
+    for cid in ids:
+        desindexar_cliente(cid)
+    indexar_cliente(manter)
+    for _, oid in movidas:
+        views_atualizar_os(oid)
+    views_cliente_alterado()
+    flash(f"{len(ids)} cliente(s) mesclado(s) em #{manter['id']}; {len(movidas)} OS transferida(s).")
+    return redirect(url_for("duplicate_clients"))
+
 # ---- Ordens de Serviço ----
 @app.route("/ordens")
 def list_orders():
@@ -456,39 +1128,32 @@ def list_orders():
     status = request.args.get("status","").strip() or None
     prioridade = request.args.get("prioridade","").strip() or None
     cliente_id = request.args.get("cliente_id","").strip() or None
-    itens = filtered_orders(q, status, prioridade, cliente_id)
+    tecnico = request.args.get("tecnico","").strip() or None
+    itens = filtered_orders(q, status, prioridade, cliente_id, tecnico)
 
     client_options = "".join([f"<option value='{c['id']}' {'selected' if str(c['id'])==str(cliente_id) else ''}>{c['nome']}</option>"
                               for c in sorted(DATA['clients'].values(), key=lambda x: x['nome'].lower())])
-
-    rows = "".join([
-        f"<tr><td>{o['id']}</td><td>{get_client_name(o['client_id'])}</td>" +
-        f"<td><span class='status {o['status']}'>{o['status']}</span></td>" +
-        f"<td>{o.get('prioridade','')}</td><td>{o.get('descricao','')[:60]}</td>" +
-        f"<td>{o.get('criado_em','')}</td><td>{o.get('prazo','')}</td>" +
-        f"<td>R$ {str(o.get('total',0)).replace('.',',')}</td>" +
-        f"<td><a class='btn' href='{url_for('edit_order', order_id=o['id'])}'>Editar</a> " +
-        f"<a class='btn' href='{url_for('print_order', order_id=o['id'])}'>Imprimir</a> " +
-        f"<form style='display:inline' method='post' action='{url_for('delete_order', order_id=o['id'])}' onsubmit='return confirm(\"Excluir OS?\")'>" +
-        f"<button class='btn' type='submit'>Excluir</button></form></td></tr>"
-    for o in itens])
+    views = " ".join([f"<a class='btn' href='{url_for('show_view', view_id=v['id'])}'>{v['nome']}</a>"
+                      for v in sorted(DATA["views"].values(), key=lambda x: x["nome"].lower())])
+    filtros = {"q": q, "status": status, "prioridade": prioridade, "cliente_id": cliente_id, "tecnico": tecnico}
 
     content = f"""
     <div class="panel">
       <h2>Ordens de serviço</h2>
+      {f"<p>Visões salvas: {views}</p>" if views else ""}
       <form method="get" class="grid">
         <div style="grid-column: span 4;">
           <label>Buscar</label>
           <input type="text" name="q" value="{q}" placeholder="Cliente, descrição, técnico, notas...">
         </div>
-        <div style="grid-column: span 3;">
+        <div style="grid-column: span 2;">
           <label>Status</label>
           <select name="status">
             <option value="">Todos</option>
             {''.join([f"<option {'selected' if status==s else ''}>{s}</option>" for s in STATUSES])}
           </select>
         </div>
-        <div style="grid-column: span 3;">
+        <div style="grid-column: span 2;">
           <label>Prioridade</label>
           <select name="prioridade">
             <option value="">Todas</option>
@@ -502,11 +1167,42 @@ def list_orders():
             {client_options}
           </select>
         </div>
+        <div style="grid-column: span 2;">
+          <label>Técnico</label>
+          <input type="text" name="tecnico" value="{tecnico or ''}">
+        </div>
         <div style="grid-column: span 12; align-self: end;">
           <button type="submit">Filtrar</button>
           <a class="btn" href="{url_for('new_order')}">Nova OS</a>
         </div>
       </form>
+      <form method="post" action="{url_for('new_view')}" class="grid" style="margin-top: 12px;">
+        {"".join([f"<input type='hidden' name='{k}' value='{v}'>" for k, v in filtros.items() if v])}
+        <div style="grid-column: span 4;">
+          <input name="nome" placeholder="Nome da visão" required>
+        </div>
+        <div style="grid-column: span 8;">
+          <button type="submit">Salvar filtros como visão</button>
+        </div>
+      </form>
+      {order_table(itens)}
+    </div>
+    """
+    return render_template_string(BASE, content=content)
+
+def order_table(itens):
+    rows = "".join([
+        f"<tr><td>{o['id']}</td><td>{get_client_name(o['client_id'])}</td>" +
+        f"<td><span class='status {o['status']}'>{o['status']}</span></td>" +
+        f"<td>{o.get('prioridade','')}</td><td>{o.get('descricao','')[:60]}</td>" +
+        f"<td>{o.get('criado_em','')}</td><td>{o.get('prazo','')}</td>" +
+        f"<td>R$ {str(o.get('total',0)).replace('.',',')}</td>" +
+        f"<td><a class='btn' href='{url_for('edit_order', order_id=o['id'])}'>Editar</a> " +
+        f"<a class='btn' href='{url_for('print_order', order_id=o['id'])}'>Imprimir</a> " +
+        f"<form style='display:inline' method='post' action='{url_for('delete_order', order_id=o['id'])}' onsubmit='return confirm(\"Excluir OS?\")'>" +
+        f"<button class='btn' type='submit'>Excluir</button></form></td></tr>"
+    for o in itens])
+    return f"""
       <table class="table">
         <thead>
           <tr>
@@ -516,10 +1212,58 @@ def list_orders():
         </thead>
         <tbody>{rows}</tbody>
       </table>
+    """
+
+# ---- Visões salvas ----
+@app.route("/visoes/nova", methods=["POST"])
+def new_view():
+    nome = request.form.get("nome","").strip()
+    if not nome:
+        flash("Informe um nome para a visão.")
+        return redirect(url_for("list_orders"))
+    vid = DATA["next_view_id"]; DATA["next_view_id"] += 1
+    filtros = {k: request.form.get(k,"").strip() or None
+               for k in ("q", "status", "prioridade", "cliente_id", "tecnico")}
+    DATA["views"][str(vid)] = {"id": vid, "nome": nome, "filtros": filtros}
+    save_data(("views", vid))
+    materializar_view(vid)
+    flash(f"Visão \"{nome}\" salva.")
+    return redirect(url_for("show_view", view_id=vid))
+
+@app.route("/visoes/<int:view_id>")
+def show_view(view_id):
+    v = DATA["views"].get(str(view_id))
+    if not v:
+        flash("Visão não encontrada.")
+        return redirect(url_for("list_orders"))
+    itens = view_orders(view_id)
+    descricao = ", ".join(f"{k}: {get_client_name(val) if k == 'cliente_id' else val}"
+                          for k, val in v["filtros"].items() if val) or "todas as ordens"
+    content = f"""
+    <div class="panel">
+      <h2>{v['nome']} ({len(itens)})</h2>
+      <p style="color: var(--muted);">{descricao}</p>
+      <a class="btn" href="{url_for('list_orders', **{k: val for k, val in v['filtros'].items() if val})}">Abrir em Ordens</a>
+      <form style="display:inline" method="post" action="{url_for('delete_view', view_id=view_id)}" onsubmit="return confirm('Excluir visão?')">
+        <button class="btn" type="submit">Excluir visão</button>
+      </form>
+      {order_table(itens)}
     </div>
     """
     return render_template_string(BASE, content=content)
 
+@app.route("/visoes/<int:view_id>/excluir", methods=["POST"])
+def delete_view(view_id):
+    vid = str(view_id)
+    if vid in DATA["views"]:
+        del DATA["views"][vid]
+        save_data(("views", vid))
+        materializar_view(vid)
+        flash("Visão excluída.")
+    else:
+        flash("Visão não encontrada.")
+    return redirect(url_for("list_orders"))
+
 @app.route("/ordens/nova", methods=["GET","POST"])
 def new_order():
     clients = sorted(DATA["clients"].values(), key=lambda x: x["nome"].lower())
@@ -549,7 +1293,9 @@ def new_order():
             "notas": request.form.get("notas","").strip()
         }
         DATA["orders"][str(oid)] = o
-        save_data()
+        save_data(("orders", oid))
+        sla_agendar(o)
+        views_atualizar_os(oid)
         flash(f"OS #{oid} criada.")
         return redirect(url_for("list_orders"))
 
@@ -617,6 +1363,7 @@ def edit_order(order_id):
     clients = sorted(DATA["clients"].values(), key=lambda x: x["nome"].lower())
 
     if request.method == "POST":
+        prazo_anterior, status_anterior = o.get("prazo"), o.get("status")
         o["client_id"] = int(request.form.get("client_id"))
         o["status"] = request.form.get("status","Aberta")
         o["prioridade"] = request.form.get("prioridade","Média")
@@ -628,7 +1375,12 @@ def edit_order(order_id):
         o["mao_obra"] = request.form.get("mao_obra","")
         o["total"] = calc_total(o["estimativa"], o["pecas"], o["mao_obra"])
         o["notas"] = request.form.get("notas","").strip()
-        save_data()
+        save_data(("orders", order_id))
+        # mudar entre dois status abertos não altera os eventos agendados
+        if (o["prazo"] != prazo_anterior
+                or (o["status"] in STATUS_ABERTOS) != (status_anterior in STATUS_ABERTOS)):
+            sla_agendar(o)
+        views_atualizar_os(order_id)
         flash("OS atualizada.")
         return redirect(url_for("list_orders"))
 
@@ -691,7 +1443,9 @@ def delete_order(order_id):
     oid = str(order_id)
     if oid in DATA["orders"]:
         del DATA["orders"][oid]
-        save_data()
+        save_data(("orders", oid))
+        sla_cancelar(oid)
+        views_atualizar_os(oid)
         flash("OS excluída.")
     else:
         flash("OS não encontrada.")
@@ -743,5 +1497,35 @@ def print_order(order_id):
 # -------------------------
 # Execução
 # -------------------------
+# python app.py                               -> instância principal
+# python app.py replica [porta]               -> réplica somente leitura (padrão 5001)
+# python app.py restaurar "AAAA-MM-DD HH:MM" [saida.json]
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    comando = sys.argv[1] if len(sys.argv) > 1 else ""
+    if comando == "restaurar":
+        uso = 'Uso: python app.py restaurar "AAAA-MM-DD HH:MM[:SS]" [saida.json]'
+        if len(sys.argv) < 3:
+            sys.exit(uso)
+        texto = sys.argv[2]
+        try:
+            ate = datetime.strptime(texto, TS_FMT if texto.count(":") == 2 else "%Y-%m-%d %H:%M")
+        except ValueError:
+            sys.exit(f"Data inválida: {texto}\n{uso}")
+        saida = sys.argv[3] if len(sys.argv) > 3 else "data.restaurado.json"
+        try:
+            restaurado = restaurar(ate)
+        except ValueError as e:
+            sys.exit(f"Erro: {e}")
+        _gravar_atomico(saida, json.dumps(restaurado, ensure_ascii=False, indent=2))
+        print(f"Estado em {texto} gravado em {saida}")
+    elif comando == "replica":
+        SOMENTE_LEITURA = True
+        threading.Thread(target=replica_worker, name="replica", daemon=True).start()
+        app.run(port=int(sys.argv[2]) if len(sys.argv) > 2 else 5001)
+    else:
+        # com debug=True o reloader executa o app num processo filho;
+        # os serviços de fundo só devem rodar nele para não duplicar trabalho
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            iniciar_monitor_sla()
+            iniciar_backups()
+        app.run(debug=True)
\ No newline at end of file